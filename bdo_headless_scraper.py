@@ -17,30 +17,59 @@ This is designed to be production-maintainable, not a demo script.
 from __future__ import annotations
 
 import asyncio
+import json
 import random
 import re
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+import sys
+from collections import OrderedDict, deque
+from dataclasses import dataclass, fields
+from itertools import islice, zip_longest
+from typing import Deque, Dict, List, Optional, Set, Tuple
 
+import orjson
 import yaml
 from playwright.async_api import (
     async_playwright,
     Browser,
     BrowserContext,
+    Error as PWError,
     Page,
     TimeoutError as PWTimeoutError,
 )
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without LibYAML
+    from yaml import SafeLoader as _YamlLoader
+
 # ============================================================
 # CONFIG MODELS
 # ============================================================
 
+# Frozen dataclasses with hand-written __slots__ (dataclass(slots=True)
+# needs Python 3.10+) have no __dict__ and reject setattr, which breaks
+# copy and pickle. These mirror the state hooks slots=True generates.
+
+def _slots_getstate(self) -> List[object]:
+    return [getattr(self, f.name) for f in fields(self)]
+
+
+def _slots_setstate(self, state: List[object]) -> None:
+    for f, value in zip(fields(self), state):
+        object.__setattr__(self, f.name, value)
+
+
 @dataclass(frozen=True)
 class ProxyLayer:
     """
     Represents a proxy pool.
     Each layer is tried in order of appearance.
     """
+    # Declared by hand, see _slots_getstate
+    __slots__ = ("name", "proxies")
+    __getstate__ = _slots_getstate
+    __setstate__ = _slots_setstate
+
     name: str
     proxies: List[str]
 
@@ -52,6 +81,7 @@ class Config:
     """
     # Browser behaviour
     headless: bool
+    no_sandbox: bool
     timeout_ms: int
     navigation_wait: str
     concurrency: int
@@ -66,6 +96,8 @@ class Config:
     retries: int
     backoff_seconds: float
     max_backoff_seconds: float
+    hedge_k: int
+    schema_cache: str
 
     # Proxies + targets
     proxy_layers: List[ProxyLayer]
@@ -76,7 +108,8 @@ def load_config(path: str = "config.yaml") -> Config:
     """
     Loads and normalizes the YAML config file.
     """
-    raw = yaml.safe_load(open(path, "r", encoding="utf-8")) or {}
+    with open(path, "rb") as f:
+        raw = yaml.load(f, Loader=_YamlLoader) or {}
 
     browser = raw.get("browser", {}) or {}
     headers = raw.get("headers", {}) or {}
@@ -103,6 +136,7 @@ def load_config(path: str = "config.yaml") -> Config:
 
     return Config(
         headless=bool(browser.get("headless", True)),
+        no_sandbox=bool(browser.get("no_sandbox", False)),
         timeout_ms=int(browser.get("timeout_ms", 25000)),
         navigation_wait=str(browser.get("navigation_wait", "domcontentloaded")),
         concurrency=int(browser.get("concurrency", 3)),
@@ -113,6 +147,8 @@ def load_config(path: str = "config.yaml") -> Config:
         retries=int(scrape.get("retries", 8)),
         backoff_seconds=float(scrape.get("backoff_seconds", 1.2)),
         max_backoff_seconds=float(scrape.get("max_backoff_seconds", 10.0)),
+        hedge_k=max(1, int(scrape.get("hedge_k", 1))),
+        schema_cache=str(scrape.get("schema_cache", "profile_schema.json") or ""),
         proxy_layers=proxy_layers,
         targets=targets,
     )
@@ -127,6 +163,11 @@ class ProxyPick:
     """
     Represents a single proxy attempt.
     """
+    # Declared by hand, see _slots_getstate
+    __slots__ = ("layer", "proxy")
+    __getstate__ = _slots_getstate
+    __setstate__ = _slots_setstate
+
     layer: str
     proxy: Optional[str]  # None = direct connection
 
@@ -142,18 +183,13 @@ class ProxyManager:
     """
 
     def __init__(self, layers: List[ProxyLayer], direct_fallback: bool = True) -> None:
-        self.layers: List[Tuple[str, List[str]]] = [
-            (layer.name, layer.proxies[:]) for layer in layers
-        ]
-
         # Shuffle proxies to avoid always hammering index 0
-        for _, proxies in self.layers:
-            random.shuffle(proxies)
+        self.layers: List[Tuple[str, Deque[str]]] = [
+            (layer.name, deque(random.sample(layer.proxies, len(layer.proxies))))
+            for layer in layers
+        ]
 
         self.direct_fallback = direct_fallback
-        self._indices: Dict[str, int] = {
-            name: 0 for name, _ in self.layers
-        }
 
     def candidates(self) -> List[ProxyPick]:
         """
@@ -164,103 +200,341 @@ class ProxyManager:
         for name, proxies in self.layers:
             if not proxies:
                 continue
-            idx = self._indices[name] % len(proxies)
-            self._indices[name] += 1
-            picks.append(ProxyPick(layer=name, proxy=proxies[idx]))
+            picks.append(ProxyPick(layer=name, proxy=proxies[0]))
+            proxies.rotate(-1)
 
         if self.direct_fallback:
             picks.append(ProxyPick(layer="direct", proxy=None))
 
         return picks
 
+    def upcoming(self, n: int) -> List[ProxyPick]:
+        """
+        Returns the next `n` first-choice picks without rotating.
+
+        These are the picks the first `n` calls to candidates() lead with,
+        i.e. the ones worth warming up before scraping starts.
+        """
+        for name, proxies in self.layers:
+            if proxies:
+                return [
+                    ProxyPick(layer=name, proxy=proxy)
+                    for proxy in islice(proxies, n)
+                ]
+
+        if self.direct_fallback:
+            return [ProxyPick(layer="direct", proxy=None)]
+
+        return []
+
 
 # ============================================================
 # SCRAPING HELPERS
 # ============================================================
 
+_CHAR_CLASS_LV_RE = re.compile(r"^(.+?)\s+Lv\s+(.+)$", re.I)
+
+
 def _clean(text: str) -> str:
     """
     Normalizes whitespace and trims text.
     """
-    return re.sub(r"\s+", " ", text or "").strip()
+    return " ".join(text.split()) if text else ""
+
+
+# Single-pass DOM walk run inside the page. Headings switch the active
+# section, <li> items are collected until the next heading, and the
+# rendered text of the leaf nodes following "Adventurer Profile" is kept
+# for the region/family heuristic. Script/style/noscript and unrendered
+# leaves are skipped and text comes from innerText, as for the <li> items.
+# Serialized once so only one CDP message crosses per page.
+#
+# Alongside the data it reports CSS paths for the profile leaves, the
+# "Adventurer Profile" header, and each section's heading and list
+# container, which ProfileSchema turns into direct selectors for
+# _SCHEMA_PROFILE_JS. A section only gets paths when all of its items
+# share one parent.
+_PROFILE_JS = """
+() => {
+    const SECTIONS = {
+        "Community Activities": "community",
+        "Life": "life",
+        "Created Characters": "characters",
+    };
+    const HEADINGS = new Set(["H1", "H2", "H3", "H4"]);
+    const PROFILE_WINDOW = 14;
+    const NON_TEXT = new Set(["SCRIPT", "STYLE", "NOSCRIPT", "TEMPLATE"]);
+    const norm = (t) => (t || "").replace(/\\s+/g, " ").trim();
+    const shownText = (el) => (
+        NON_TEXT.has(el.tagName) || el.getClientRects().length === 0
+            ? ""
+            : norm(el.innerText)
+    );
+    const cssPath = (el) => {
+        const parts = [];
+        for (; el && el !== document.documentElement; el = el.parentElement) {
+            let nth = 1;
+            for (let sib = el.previousElementSibling; sib; sib = sib.previousElementSibling) {
+                if (sib.tagName === el.tagName) nth++;
+            }
+            parts.unshift(`${el.tagName.toLowerCase()}:nth-of-type(${nth})`);
+        }
+        parts.unshift("html");
+        return parts.join(" > ");
+    };
+
+    const out = {profile: [], community: [], life: [], characters: []};
+    const profilePaths = [];
+    const parents = {};
+    const headings = {};
+    let section = null;
+    let sectionHeading = null;
+    let profileHeading = null;
+    let inProfile = false;
+
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT);
+    for (let el = walker.nextNode(); el; el = walker.nextNode()) {
+        const isHeading = HEADINGS.has(el.tagName);
+        const isLeaf = el.childElementCount === 0;
+
+        if (isHeading) {
+            section = SECTIONS[norm(el.textContent)] || null;
+            sectionHeading = el;
+        } else if (el.tagName === "LI" && section) {
+            out[section].push(el.innerText);
+            if (!(section in parents)) {
+                parents[section] = el.parentElement;
+                headings[section] = sectionHeading;
+            } else if (parents[section] !== el.parentElement) {
+                parents[section] = null;
+            }
+        }
+
+        if ((isHeading || isLeaf) && norm(el.textContent) === "Adventurer Profile") {
+            inProfile = out.profile.length === 0;
+            if (inProfile) profileHeading = el;
+        } else if (inProfile && isLeaf) {
+            const text = shownText(el);
+            if (text) {
+                out.profile.push(text);
+                profilePaths.push(cssPath(el));
+                inProfile = out.profile.length < PROFILE_WINDOW;
+            }
+        }
+    }
 
+    out.profile_paths = profilePaths;
+    out.profile_heading = profileHeading ? cssPath(profileHeading) : null;
+    out.sections = {};
+    for (const name of Object.values(SECTIONS)) {
+        out.sections[name] = parents[name]
+            ? {list: cssPath(parents[name]), heading: cssPath(headings[name])}
+            : null;
+    }
+
+    return JSON.stringify(out);
+}
+"""
 
-async def _extract_section_list(page: Page, heading_text: str) -> List[str]:
+# Direct lookups using a learned ProfileSchema. Bare nth-of-type paths can
+# silently shift when a profile hides or adds a block, so every learned
+# heading must still carry its expected text. Returns null as soon as any
+# selector misses or a heading does not match, so the caller can fall back
+# to _PROFILE_JS.
+_SCHEMA_PROFILE_JS = """
+(schema) => {
+    const HEADINGS = {
+        profile_heading: "Adventurer Profile",
+        community_heading: "Community Activities",
+        life_heading: "Life",
+        characters_heading: "Created Characters",
+    };
+    const NON_TEXT = new Set(["SCRIPT", "STYLE", "NOSCRIPT", "TEMPLATE"]);
+    const norm = (t) => (t || "").replace(/\\s+/g, " ").trim();
+    const shownText = (el) => (
+        NON_TEXT.has(el.tagName) || el.getClientRects().length === 0
+            ? ""
+            : norm(el.innerText)
+    );
+
+    for (const [key, title] of Object.entries(HEADINGS)) {
+        const heading = document.querySelector(schema[key]);
+        if (!heading || norm(heading.textContent) !== title) return null;
+    }
+
+    const items = (selector) => {
+        const parent = document.querySelector(selector);
+        if (!parent) return null;
+        return Array.from(parent.children)
+            .filter((el) => el.tagName === "LI")
+            .map((el) => el.innerText);
+    };
+
+    const region = document.querySelector(schema.region);
+    const family = document.querySelector(schema.family_name);
+    const out = {
+        profile: [region ? shownText(region) : "", family ? shownText(family) : ""],
+        community: items(schema.community),
+        life: items(schema.life),
+        characters: items(schema.characters),
+    };
+
+    if (!region || !out.profile[1] || !out.community || !out.life || !out.characters) {
+        return null;
+    }
+    return JSON.stringify(out);
+}
+"""
+
+
+def _region_index(profile_lines: List[str]) -> Optional[int]:
     """
-    Extracts <li> items under a given section heading.
+    Locates the region code in the nodes following "Adventurer Profile".
 
-    Works even if the DOM structure changes,
-    as long as headings remain semantic.
+    The first 2-3 letter upper-case ASCII token is the region code and
+    the node after it is the family name.
+    """
+    for idx, line in enumerate(profile_lines[:-1]):
+        if (
+                len(line) in (2, 3)
+                and line.isascii()
+                and line.isalpha()
+                and line.isupper()
+        ):
+            return idx
+    return None
+
+
+class ProfileSchema:
     """
-    heading = page.locator(
-        f"xpath=//*[self::h1 or self::h2 or self::h3 or self::h4]"
-        f"[normalize-space()='{heading_text}']"
-    ).first
+    CSS selectors for each profile field, learned from a generic parse.
 
-    if await heading.count() == 0:
-        return []
+    Persisted to disk so later pages (and later runs) can be read with
+    direct querySelector lookups instead of a full DOM walk.
+    """
 
-    # Collect all list items following the heading until the next heading
-    items = page.locator(
-        f"xpath=//*[self::h1 or self::h2 or self::h3 or self::h4]"
-        f"[normalize-space()='{heading_text}']"
-        f"/following::*[not(self::h1 or self::h2 or self::h3 or self::h4)]"
-        f"[self::li]"
+    FIELDS = (
+        "profile_heading",
+        "region",
+        "family_name",
+        "community_heading",
+        "community",
+        "life_heading",
+        "life",
+        "characters_heading",
+        "characters",
     )
 
-    texts = await items.all_inner_texts()
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.selectors: Optional[Dict[str, str]] = self._load()
+
+    def _load(self) -> Optional[Dict[str, str]]:
+        if not self.path:
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict):
+            return None
+        if not all(isinstance(data.get(field), str) for field in self.FIELDS):
+            return None
+        return {field: data[field] for field in self.FIELDS}
+
+    def learn(self, raw: Dict) -> None:
+        """
+        Rebuilds the selectors from a _PROFILE_JS result.
 
-    return [_clean(t) for t in texts if _clean(t)]
+        Keeps the current selectors if this page cannot yield a complete set.
+        """
+        idx = _region_index(raw["profile"])
+        sections = raw["sections"]
+        if idx is None or not raw["profile_heading"] or not all(sections.values()):
+            return
+
+        selectors = {
+            "profile_heading": raw["profile_heading"],
+            "region": raw["profile_paths"][idx],
+            "family_name": raw["profile_paths"][idx + 1],
+        }
+        for name, paths in sections.items():
+            selectors[f"{name}_heading"] = paths["heading"]
+            selectors[name] = paths["list"]
+        if selectors == self.selectors:
+            return
+
+        self.selectors = selectors
+        if self.path:
+            try:
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump(selectors, f, indent=2)
+            except OSError:
+                pass  # the on-disk cache is best-effort
 
 
-async def parse_profile(page: Page, url: str) -> Dict:
+async def parse_profile(page: Page, url: str, schema: ProfileSchema) -> Dict:
     """
     Parses all relevant profile data from the rendered page.
+
+    Uses the learned schema when available; if any of its selectors miss,
+    falls back to the generic DOM walk and relearns the schema from it.
     """
-    body_text = _clean(await page.locator("body").inner_text())
-    lines = [l for l in body_text.split("\n") if l]
+    if schema.selectors:
+        payload = await page.evaluate(_SCHEMA_PROFILE_JS, schema.selectors)
+        if payload:
+            raw = json.loads(payload)
+            if _region_index(raw["profile"]) == 0:
+                return _build_profile(url, raw)
+
+    raw = json.loads(await page.evaluate(_PROFILE_JS))
+    schema.learn(raw)
+    return _build_profile(url, raw)
+
+
+def _build_profile(url: str, raw: Dict) -> Dict:
+    """
+    Turns the raw text extracted in the page into the profile record.
+    """
+    profile_lines = [_clean(t) for t in raw["profile"]]
+    community_raw = [_clean(t) for t in raw["community"] if _clean(t)]
+    life_raw = [_clean(t) for t in raw["life"] if _clean(t)]
+    created_raw = [_clean(t) for t in raw["characters"] if _clean(t)]
 
     region = None
     family_name = None
 
-    # Heuristic extraction near "Adventurer Profile"
-    if "Adventurer Profile" in lines:
-        i = lines.index("Adventurer Profile")
-        window = lines[i : i + 15]
-        for idx in range(len(window) - 1):
-            if re.fullmatch(r"[A-Z]{2,3}", window[idx]):
-                region = window[idx]
-                family_name = window[idx + 1]
-                break
-
-    community_raw = await _extract_section_list(page, "Community Activities")
-    life_raw = await _extract_section_list(page, "Life")
-    created_raw = await _extract_section_list(page, "Created Characters")
+    idx = _region_index(profile_lines)
+    if idx is not None:
+        region = profile_lines[idx]
+        family_name = profile_lines[idx + 1]
 
     community: Dict[str, str] = {}
     for item in community_raw:
-        match = re.match(r"^(.*?)(?:\s{2,}|\s:\s)(.+)$", item)
-        if match:
-            community[_clean(match.group(1))] = _clean(match.group(2))
+        # "key : value" or "key  value"; anything else is a bare key
+        key, sep, value = item.partition(" : ")
+        if not sep:
+            key, sep, value = item.partition("  ")
+        if sep and value.strip():
+            community[_clean(key)] = _clean(value)
         else:
             community[item] = ""
 
     characters: List[Dict] = []
-    i = 0
-    while i < len(created_raw):
-        name_line = created_raw[i]
+    # Entries come in (name, "Class Lv N") pairs; a trailing name has no class line
+    pairs = iter(created_raw)
+    for name_line, cls_line in zip_longest(pairs, pairs, fillvalue=""):
         is_main = "Main Character" in name_line
         name = _clean(name_line.replace("Main Character", ""))
 
         class_name = ""
         level = ""
 
-        if i + 1 < len(created_raw):
-            cls_line = created_raw[i + 1]
-            match = re.match(r"^(.+?)\s+Lv\s+(.+)$", cls_line, re.I)
-            if match:
-                class_name = _clean(match.group(1))
-                level = _clean(match.group(2))
+        match = _CHAR_CLASS_LV_RE.match(cls_line)
+        if match:
+            class_name = _clean(match.group(1))
+            level = _clean(match.group(2))
 
         if name:
             characters.append(
@@ -272,8 +546,6 @@ async def parse_profile(page: Page, url: str) -> Dict:
                 }
             )
 
-        i += 2
-
     return {
         "source_url": url,
         "region": region,
@@ -288,6 +560,30 @@ async def parse_profile(page: Page, url: str) -> Dict:
 # BROWSER + SCRAPER LOGIC
 # ============================================================
 
+# URL patterns for resources parse_profile never reads. Stylesheets are
+# kept because innerText depends on computed layout/visibility. Blocked via
+# Chromium's Network.setBlockedURLs instead of context.route(): routing
+# disables the HTTP cache for the whole context and sends every request
+# through Python, which would defeat reusing pooled contexts.
+_BLOCKED_URL_PATTERNS = [
+    f"*.{ext}*"
+    for ext in (
+        "png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico",
+        "woff", "woff2", "ttf", "otf", "eot",
+        "mp4", "webm", "mp3", "ogg", "wav",
+    )
+]
+
+
+async def _block_heavy_resources(page: Page) -> None:
+    """
+    Blocks image, font and media URLs for this page without routing.
+    """
+    session = await page.context.new_cdp_session(page)
+    await session.send("Network.enable")
+    await session.send("Network.setBlockedURLs", {"urls": _BLOCKED_URL_PATTERNS})
+
+
 async def new_context(
         browser: Browser,
         cfg: Config,
@@ -314,39 +610,260 @@ async def new_context(
     return await browser.new_context(**context_args)
 
 
+# Upper bound on waiting for the profile header after navigation
+_PROFILE_HEADER_WAIT_MS = 3000
+
+
+class _PoolEntry:
+    """
+    A pooled context plus the number of attempts currently using it.
+    """
+
+    __slots__ = ("pick", "future", "leases", "retired")
+
+    def __init__(self, pick: ProxyPick, future: "asyncio.Future[BrowserContext]") -> None:
+        self.pick = pick
+        self.future = future
+        self.leases = 0
+        self.retired = False
+
+    @property
+    def context(self) -> BrowserContext:
+        return self.future.result()
+
+
+class ContextPool:
+    """
+    Caches one browser context per proxy pick.
+
+    Contexts are reused across targets so Chromium does not pay renderer,
+    cookie jar and HTTP cache startup on every URL. Contexts are shared by
+    all workers, so each attempt leases its context and a context is only
+    closed once it is retired (network failure or LRU eviction) and the
+    last lease on it has been released.
+
+    Entries hold the creation future rather than the context, so concurrent
+    callers for the same pick share one creation and different picks are
+    created in parallel. Dict and lease updates never await, so no lock is
+    needed, and retired contexts are closed in background tasks so a caller
+    cancelled mid-close cannot leak a lease or an unclosed context.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[ProxyPick, _PoolEntry]" = OrderedDict()
+        self._closing: Set["asyncio.Future[None]"] = set()
+
+    async def acquire(
+            self,
+            browser: Browser,
+            cfg: Config,
+            pick: ProxyPick,
+    ) -> _PoolEntry:
+        """
+        Leases the cached context for this pick, creating it on a miss.
+
+        Every successful acquire must be paired with release().
+        """
+        entry = self._entries.get(pick)
+        if entry is not None:
+            self._entries.move_to_end(pick)
+        else:
+            entry = _PoolEntry(
+                pick, asyncio.ensure_future(new_context(browser, cfg, pick))
+            )
+            self._entries[pick] = entry
+
+            while len(self._entries) > self.max_size:
+                _, oldest = self._entries.popitem(last=False)
+                oldest.retired = True
+                if oldest.leases == 0:
+                    self._close_later(oldest)
+
+        try:
+            entry.leases += 1
+            # Shielded so a cancelled caller does not abort a shared creation
+            await asyncio.shield(entry.future)
+        except BaseException as e:
+            if isinstance(e, Exception):
+                self._retire(entry)
+            self.release(entry)
+            raise
+
+        return entry
+
+    def release(self, entry: _PoolEntry, discard: bool = False) -> None:
+        """
+        Returns a lease. With discard=True the context is retired, so new
+        attempts get a fresh one; it is closed once no attempt still uses it.
+        """
+        entry.leases -= 1
+        if discard:
+            self._retire(entry)
+        if entry.retired and entry.leases == 0:
+            self._close_later(entry)
+
+    def _retire(self, entry: _PoolEntry) -> None:
+        if self._entries.get(entry.pick) is entry:
+            del self._entries[entry.pick]
+        entry.retired = True
+
+    def _close_later(self, entry: _PoolEntry) -> None:
+        task = asyncio.ensure_future(_close_quietly(entry.future))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def warm_up(
+            self,
+            browser: Browser,
+            cfg: Config,
+            picks: List[ProxyPick],
+    ) -> None:
+        """
+        Creates contexts for the given picks in parallel ahead of scraping.
+
+        Failures are ignored; the pick is simply created again on first use.
+        """
+        async def warm(pick: ProxyPick) -> None:
+            self.release(await self.acquire(browser, cfg, pick))
+
+        await asyncio.gather(
+            *(warm(pick) for pick in picks),
+            return_exceptions=True,
+        )
+
+    async def close(self) -> None:
+        """
+        Closes every cached context and waits for pending closes.
+        """
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for entry in entries:
+            entry.retired = True
+            self._close_later(entry)
+        await asyncio.gather(*list(self._closing))
+
+
+async def _close_quietly(future: "asyncio.Future[BrowserContext]") -> None:
+    """
+    Closes the context a (possibly pending) creation resolves to, ignoring
+    errors from a failed creation or an already-dead context.
+    """
+    try:
+        context = await future
+        await context.close()
+    except Exception:
+        pass
+
+
+def _is_network_error(error: BaseException) -> bool:
+    """
+    True for Chromium network-stack failures (dead proxy, refused or reset
+    connection, DNS, tunnel errors), which warrant a fresh context.
+    """
+    return isinstance(error, PWError) and "net::ERR_" in str(error)
+
+
+async def _try_pick(
+        cfg: Config,
+        pool: ContextPool,
+        schema: ProfileSchema,
+        browser: Browser,
+        url: str,
+        pick: ProxyPick,
+) -> Dict:
+    """
+    Scrapes a profile through a single proxy pick.
+
+    The pick's context is discarded only on network errors; other failures
+    (timeouts, parse errors) and cancellation just close the page.
+    """
+    entry = await pool.acquire(browser, cfg, pick)
+    page: Optional[Page] = None
+    discard = False
+    try:
+        page = await entry.context.new_page()
+        await _block_heavy_resources(page)
+        page.set_default_timeout(cfg.timeout_ms)
+
+        await page.goto(url, wait_until=cfg.navigation_wait)
+        # Resolves as soon as the hydrated profile header is attached.
+        # Invalid, private or maintenance pages never show it, so the wait
+        # is short and a timeout just parses whatever is there.
+        try:
+            await page.locator("text=Adventurer Profile").first.wait_for(
+                state="attached",
+                timeout=min(cfg.timeout_ms, _PROFILE_HEADER_WAIT_MS),
+            )
+        except PWTimeoutError:
+            pass
+
+        data = await parse_profile(page, url, schema)
+        data["_proxy_layer"] = pick.layer
+        data["_proxy"] = pick.proxy
+        return data
+
+    except Exception as e:
+        discard = _is_network_error(e)
+        raise
+
+    finally:
+        try:
+            if page and not page.is_closed():
+                await page.close()
+        except Exception:
+            pass
+        finally:
+            pool.release(entry, discard=discard)
+
+
 async def scrape_one(
         cfg: Config,
         pm: ProxyManager,
+        pool: ContextPool,
+        schema: ProfileSchema,
         browser: Browser,
         url: str,
 ) -> Dict:
     """
     Scrapes a single profile with retries and proxy rotation.
+
+    Proxy candidates are tried in groups of `hedge_k`: every pick in a group
+    runs concurrently, the first success wins and the rest are cancelled.
+    With hedge_k = 1 this is a plain serial try-all. The direct connection
+    is never raced; it is only tried on its own after every proxy failed.
     """
     last_error: Optional[Exception] = None
 
     for attempt in range(1, cfg.retries + 1):
-        for pick in pm.candidates():
-            context: Optional[BrowserContext] = None
+        picks = pm.candidates()
+        proxied = [pick for pick in picks if pick.proxy]
+        groups = [
+            proxied[start : start + cfg.hedge_k]
+            for start in range(0, len(proxied), cfg.hedge_k)
+        ]
+        groups.extend([pick] for pick in picks if not pick.proxy)
+
+        for group in groups:
+            pending = {
+                asyncio.ensure_future(
+                    _try_pick(cfg, pool, schema, browser, url, pick)
+                )
+                for pick in group
+            }
             try:
-                context = await new_context(browser, cfg, pick)
-                page = await context.new_page()
-                page.set_default_timeout(cfg.timeout_ms)
-
-                await page.goto(url, wait_until=cfg.navigation_wait)
-                await page.wait_for_timeout(250)  # allow minor JS hydration
-
-                data = await parse_profile(page, url)
-                data["_proxy_layer"] = pick.layer
-                data["_proxy"] = pick.proxy
-                return data
-
-            except (PWTimeoutError, Exception) as e:
-                last_error = e
-
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        if task.exception() is None:
+                            return task.result()
+                        last_error = task.exception()
             finally:
-                if context:
-                    await context.close()
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
 
         backoff = min(
             cfg.max_backoff_seconds,
@@ -361,35 +878,66 @@ async def scrape_one(
 # ENTRYPOINT
 # ============================================================
 
+# Extra Chromium flags on top of Playwright's own defaults, which already
+# cover extensions, background throttling, first-run and feature switches.
+# Don't pass --disable-features here: Chromium keeps only the last copy of
+# a repeated switch, so it would replace Playwright's list.
+# --no-sandbox is only added when the config opts in (browser.no_sandbox),
+# e.g. for root-in-container setups.
+_CHROMIUM_ARGS = ["--disable-gpu"]
+
+
 async def run() -> None:
     """
     Main async entrypoint.
     """
     cfg = load_config("config.yaml")
     pm = ProxyManager(cfg.proxy_layers, direct_fallback=True)
-    semaphore = asyncio.Semaphore(cfg.concurrency)
+    pool = ContextPool(max_size=cfg.concurrency * 2)
+    schema = ProfileSchema(cfg.schema_cache)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=cfg.headless)
+    # Fixed set of workers pulling from a queue, so only `concurrency`
+    # tasks exist regardless of how many targets are configured.
+    queue: asyncio.Queue[Tuple[int, str]] = asyncio.Queue()
+    for index, url in enumerate(cfg.targets):
+        queue.put_nowait((index, url))
 
-        async def worker(target_url: str) -> Dict:
-            async with semaphore:
-                return await scrape_one(cfg, pm, browser, target_url)
+    results: List[object] = [None] * len(cfg.targets)
 
-        results = await asyncio.gather(
-            *(worker(url) for url in cfg.targets),
-            return_exceptions=True,
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(
+            headless=cfg.headless,
+            args=_CHROMIUM_ARGS + (["--no-sandbox"] if cfg.no_sandbox else []),
+        )
+
+        # Pay context cold starts in parallel before the workers need them
+        await pool.warm_up(browser, cfg, pm.upcoming(cfg.concurrency))
+
+        async def worker() -> None:
+            while not queue.empty():
+                index, target_url = queue.get_nowait()
+                try:
+                    results[index] = await scrape_one(
+                        cfg, pm, pool, schema, browser, target_url
+                    )
+                except Exception as e:
+                    results[index] = e
+
+        await asyncio.gather(
+            *(worker() for _ in range(min(cfg.concurrency, len(cfg.targets))))
         )
 
+        await pool.close()
         await browser.close()
 
+    # One JSON line per profile, written straight to the byte buffer
+    out = sys.stdout.buffer
     for result in results:
         if isinstance(result, Exception):
-            print("ERROR:", result)
+            out.write(b"ERROR: " + str(result).encode("utf-8") + b"\n")
         else:
-            print("\n==== PROFILE ====")
-            for key, value in result.items():
-                print(f"{key}: {value}")
+            out.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
+    out.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+"""
+Tests for ContextPool leasing, eviction, discard and cancellation.
+
+Browser contexts are replaced with in-memory fakes via new_context.
+"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import bdo_headless_scraper as scraper
+from bdo_headless_scraper import ContextPool, ProxyPick
+
+
+class FakeContext:
+    def __init__(self, name: str, close_delay: float = 0.0) -> None:
+        self.name = name
+        self.close_delay = close_delay
+        self.closed = False
+
+    async def close(self) -> None:
+        await asyncio.sleep(self.close_delay)
+        self.closed = True
+
+
+class ContextPoolTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.created = []
+        self.create_delay = 0.0
+        self.close_delay = 0.0
+
+        async def fake_new_context(browser, cfg, pick):
+            await asyncio.sleep(self.create_delay)
+            context = FakeContext(pick.proxy, self.close_delay)
+            self.created.append(context)
+            return context
+
+        patcher = mock.patch.object(scraper, "new_context", fake_new_context)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def pick(name: str) -> ProxyPick:
+        return ProxyPick(layer="test", proxy=name)
+
+    async def settle(self) -> None:
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def test_reuses_context_for_same_pick(self):
+        pool = ContextPool(max_size=2)
+        first = await pool.acquire(None, None, self.pick("a"))
+        second = await pool.acquire(None, None, self.pick("a"))
+
+        self.assertIs(first.context, second.context)
+        self.assertEqual(first.leases, 2)
+        self.assertEqual(len(self.created), 1)
+
+    async def test_lru_eviction_closes_idle_context(self):
+        pool = ContextPool(max_size=1)
+        pool.release(await pool.acquire(None, None, self.pick("a")))
+        pool.release(await pool.acquire(None, None, self.pick("b")))
+        await self.settle()
+
+        a, b = self.created
+        self.assertTrue(a.closed)
+        self.assertFalse(b.closed)
+
+    async def test_lru_eviction_waits_for_last_lease(self):
+        pool = ContextPool(max_size=1)
+        held = await pool.acquire(None, None, self.pick("a"))
+        pool.release(await pool.acquire(None, None, self.pick("b")))
+        await self.settle()
+        self.assertFalse(held.context.closed)
+
+        pool.release(held)
+        await self.settle()
+        self.assertTrue(held.context.closed)
+
+    async def test_discard_retires_but_keeps_other_leases_alive(self):
+        pool = ContextPool(max_size=2)
+        failed = await pool.acquire(None, None, self.pick("a"))
+        busy = await pool.acquire(None, None, self.pick("a"))
+
+        pool.release(failed, discard=True)
+        await self.settle()
+        self.assertFalse(busy.context.closed)
+
+        fresh = await pool.acquire(None, None, self.pick("a"))
+        self.assertIsNot(fresh.context, busy.context)
+
+        pool.release(busy)
+        await self.settle()
+        self.assertTrue(busy.context.closed)
+        self.assertFalse(fresh.context.closed)
+
+    async def test_cancelled_acquire_releases_lease(self):
+        pool = ContextPool(max_size=2)
+        self.create_delay = 0.05
+        task = asyncio.ensure_future(pool.acquire(None, None, self.pick("a")))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        # The shared creation still completes and stays pooled, unleased
+        entry = await pool.acquire(None, None, self.pick("a"))
+        self.assertEqual(entry.leases, 1)
+        self.assertEqual(len(self.created), 1)
+
+    async def test_cancel_during_eviction_does_not_leak(self):
+        pool = ContextPool(max_size=1)
+        self.close_delay = 0.05
+        pool.release(await pool.acquire(None, None, self.pick("a")))
+
+        self.create_delay = 0.02
+        task = asyncio.ensure_future(pool.acquire(None, None, self.pick("b")))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        await pool.close()
+        self.assertTrue(all(context.closed for context in self.created))
+        self.assertEqual(len(self.created), 2)
+
+    async def test_failed_creation_is_dropped(self):
+        pool = ContextPool(max_size=2)
+
+        async def failing_new_context(browser, cfg, pick):
+            raise RuntimeError("boom")
+
+        with mock.patch.object(scraper, "new_context", failing_new_context):
+            with self.assertRaises(RuntimeError):
+                await pool.acquire(None, None, self.pick("a"))
+
+        entry = await pool.acquire(None, None, self.pick("a"))
+        self.assertEqual(entry.leases, 1)
+        self.assertEqual(len(self.created), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()